@@ -91,6 +91,13 @@ async def startup_event():
     print("✅ Sensor broadcast started")
 
 
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled resources"""
+    await public_data_service.aclose()
+
+
 async def broadcast_sensor_data():
     """Broadcast sensor data to all WebSocket clients"""
     print("📡 Starting sensor data broadcast loop...")
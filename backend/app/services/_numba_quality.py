@@ -0,0 +1,20 @@
+"""Numba kernel for data-quality timeliness scoring.
+
+Importing this module requires numba; callers treat it as an optional
+accelerator and keep a NumPy fallback, mirroring cement_chem_numba.
+"""
+from numba import njit
+
+
+@njit(cache=True)
+def timeliness(ages_h):
+    """Sum the 25/20/10 freshness buckets over an array of ages in hours"""
+    score = 0.0
+    for age in ages_h:
+        if age < 1:
+            score += 25.0
+        elif age < 4:
+            score += 20.0
+        elif age < 24:
+            score += 10.0
+    return score
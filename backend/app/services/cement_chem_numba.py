@@ -0,0 +1,61 @@
+"""Vectorized cement chemistry kernels for batched validation.
+
+JIT-compiled with Numba when it is installed; otherwise the same functions run
+as plain NumPy, so callers never need to care which path is active. All inputs
+are 1-D float64 arrays of oxide percentages.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - numba is an optional accelerator
+    njit = None
+
+
+def _jit(func):
+    """Apply njit when available, otherwise return the NumPy implementation"""
+    if njit is not None:
+        return njit(cache=True, fastmath=True)(func)
+    return func
+
+
+@_jit
+def lsf_arr(cao, so3, sio2, al2o3, fe2o3):
+    """Lime Saturation Factor for arrays of compositions"""
+    denom = 2.8 * sio2 + 1.2 * al2o3 + 0.65 * fe2o3
+    safe = np.where(denom == 0, 1.0, denom)
+    return np.where(denom == 0, 0.0, (cao - 0.7 * so3) / safe)
+
+
+@_jit
+def silica_modulus_arr(sio2, al2o3, fe2o3):
+    """Silica Modulus for arrays of compositions"""
+    denom = al2o3 + fe2o3
+    safe = np.where(denom == 0, 1.0, denom)
+    return np.where(denom == 0, 0.0, sio2 / safe)
+
+
+@_jit
+def alumina_modulus_arr(al2o3, fe2o3):
+    """Alumina Modulus for arrays of compositions"""
+    safe = np.where(fe2o3 == 0, 1.0, fe2o3)
+    return np.where(fe2o3 == 0, 0.0, al2o3 / safe)
+
+
+@_jit
+def bogue_phases_arr(cao, sio2, al2o3, fe2o3):
+    """Bogue clinker phases (C3S, C2S, C3A, C4AF), normalized to 100%"""
+    c3s = 4.071 * cao - 7.600 * sio2 - 6.718 * al2o3 - 1.430 * fe2o3
+    c2s = 2.867 * sio2 - 0.7544 * c3s
+    c3a = 2.650 * al2o3 - 1.692 * fe2o3
+    c4af = 3.043 * fe2o3
+
+    c3s = np.minimum(np.maximum(c3s, 0.0), 100.0)
+    c2s = np.minimum(np.maximum(c2s, 0.0), 100.0)
+    c3a = np.minimum(np.maximum(c3a, 0.0), 100.0)
+    c4af = np.minimum(np.maximum(c4af, 0.0), 100.0)
+
+    total = c3s + c2s + c3a + c4af
+    scale = np.where(total > 0, 100.0 / np.where(total > 0, total, 1.0), 1.0)
+
+    return c3s * scale, c2s * scale, c3a * scale, c4af * scale
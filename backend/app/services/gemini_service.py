@@ -1,12 +1,152 @@
+import asyncio
+import functools
+import io
+import time
 import google.generativeai as genai
+from collections import deque
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from app.config import settings
 import json
+import orjson
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Configuring the API is a process-wide side effect and the model object owns
+# the underlying channel, so both happen once at import rather than per
+# instance. grpc_asyncio keeps one persistent HTTP/2 channel across calls
+# instead of re-negotiating TLS per request.
+genai.configure(api_key=settings.GEMINI_API_KEY, transport='grpc_asyncio')
+_MODEL = genai.GenerativeModel('gemini-2.0-flash')
+
+# Matches a response wrapped in markdown code fences (```json ... ``` or bare ```),
+# tolerating any casing of the language tag and surrounding whitespace
+_FENCE = re.compile(r'^\s*```(?:json)?\s*(.*?)\s*```\s*$', re.IGNORECASE | re.DOTALL)
+
+
+def _extract_json(text: str) -> str:
+    """Strip markdown code fences from a model response, if present"""
+    match = _FENCE.match(text)
+    return (match.group(1) if match else text).strip()
+
+
+class _RollingStats:
+    """Welford online mean/variance for one sensor tag"""
+
+    __slots__ = ('count', 'mean', '_m2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return 0.0
+        return (self._m2 / self.count) ** 0.5
+
+
+# Tags always kept in the prompt regardless of volatility ranking
+_PROMPT_SENSOR_WHITELIST = frozenset({
+    'temperature', 'burning_zone_temp', 'oxygen_level',
+    'fuel_flow', 'fuel_rate', 'kiln_speed', 'outlet_temp', 'cooler_efficiency'
+})
+
+# Cap on sensor entries serialized into a prompt
+_MAX_PROMPT_SENSORS = 50
+
+
+# Response schema for analyze_with_context, enforced server-side via JSON mode
+# instead of being spelled out inline in the prompt
+_ANALYSIS_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {
+        'status': {'type': 'STRING', 'enum': ['normal', 'warning', 'critical']},
+        'health_score': {'type': 'NUMBER'},
+        'efficiency_score': {'type': 'NUMBER'},
+        'issues': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+        'recommendations': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+        'optimization_opportunities': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+        'environmental_adjustments': {'type': 'ARRAY', 'items': {'type': 'STRING'}},
+        'fuel_switching_potential': {'type': 'STRING'},
+        'confidence_level': {'type': 'NUMBER'}
+    },
+    'required': ['status', 'health_score', 'efficiency_score', 'issues', 'recommendations']
+}
+
+_ANALYSIS_GENERATION_CONFIG = genai.GenerationConfig(
+    response_mime_type='application/json',
+    response_schema=_ANALYSIS_SCHEMA
+)
+
+# generate_optimization_plan has open-ended keys (parameter names), so only
+# JSON mode is enforced and the structure stays described in the prompt
+_JSON_GENERATION_CONFIG = genai.GenerationConfig(
+    response_mime_type='application/json'
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _format_targets_block(thermal: float, electrical: float, co2: float, alt_rate: float) -> str:
+    """Format the target-metrics prompt block; few distinct combinations occur
+    in practice, so formatted blocks are memoized"""
+    return (
+        "TARGET METRICS:\n"
+        f"        - Thermal Energy: < {thermal} GJ/tonne\n"
+        f"        - Electrical Energy: < {electrical} kWh/tonne\n"
+        f"        - CO2 Emissions: < {co2} kg/tonne\n"
+        f"        - Alternative Fuel Rate: > {alt_rate}%"
+    )
+
+
+# The dashboard default passes an empty dict, so the all-defaults block is
+# rendered exactly once at import
+_DEFAULT_TARGETS_BLOCK = _format_targets_block(3.2, 95, 850, 50)
+
+# Context entries older than this are dropped; the "recent status" signal
+# is worthless after 15 minutes and retaining more just inflates memory
+_CONTEXT_TTL_SECONDS = 900
+
+# Static prompt tails kept out of the f-strings so they are interned once at
+# import instead of being re-rendered (and brace-escaped) on every call
+_ANALYZE_PROMPT_SUFFIX = """
+        Analyze this data considering:
+        1. Current operational efficiency and any anomalies
+        2. Impact of environmental conditions on operations
+        3. Opportunities for alternative fuel utilization
+        4. Chemistry balance and product quality
+        5. Energy optimization potential
+
+        Score health and efficiency from 0-100 and confidence from 0-1.
+        """
+
+_PLAN_PROMPT_SUFFIX = r"""
+        Generate an optimization plan with:
+        1. Specific parameter adjustments with expected impact
+        2. Implementation sequence and timeline
+        3. Risk assessment and mitigation strategies
+        4. Expected ROI and payback period
+        5. Monitoring KPIs
+
+        Format as JSON with structure:
+        {
+            "parameter_adjustments": {"parameter": {"current": value, "target": value, "impact": "description"}},
+            "implementation_phases": [{"phase": 1, "duration_days": N, "actions": [], "expected_results": {}}],
+            "risk_assessment": [{"risk": "description", "probability": "low/medium/high", "mitigation": "strategy"}],
+            "financial_analysis": {"investment_required": value, "annual_savings": value, "payback_months": N},
+            "success_metrics": [{"kpi": "name", "current": value, "target": value, "measurement_frequency": "daily/weekly"}]
+        }
+        """
+
 
 class DateTimeEncoder(json.JSONEncoder):
     """Custom JSON encoder that handles datetime objects"""
@@ -35,18 +175,23 @@ class EnhancedGeminiService:
     """Enhanced Gemini service with context-aware analysis"""
 
     def __init__(self):
-        genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
-        self.context_window = []  # Store conversation context
+        self.model = _MODEL
+        # Recent per-unit status summaries only - never the full analysis
+        # dict, which would grow memory and prompt tokens without bound
+        self.context_window = deque()
         self.max_context_length = 10
-
-    async def analyze_with_context(self, unit: str, combined_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze data with environmental and operational context"""
-
-        # Sanitize data to remove datetime objects
-        sanitized_data = sanitize_for_json(combined_data)
-
-        prompt = f"""
+        self._sensor_stats: Dict[str, _RollingStats] = {}
+
+    def _recent_context(self) -> List[Dict[str, Any]]:
+        """Return context entries still within the TTL, pruning expired ones"""
+        cutoff = time.monotonic() - _CONTEXT_TTL_SECONDS
+        while self.context_window and self.context_window[0]['ts'] < cutoff:
+            self.context_window.popleft()
+        return list(self.context_window)
+
+    def _build_analyze_prompt(self, unit: str, sanitized_data: Dict[str, Any]) -> str:
+        """Build the context-analysis prompt (CPU-bound, run off the event loop)"""
+        return f"""
         You are an expert AI agent managing the {unit} in a cement plant with access to real-time sensor data and environmental context.
 
         CURRENT OPERATIONAL DATA:
@@ -59,50 +204,80 @@ class EnhancedGeminiService:
 
         FUEL AVAILABILITY:
         {json.dumps(sanitized_data.get('fuel_availability', {}), indent=2)}
+        """ + _ANALYZE_PROMPT_SUFFIX
 
-        Analyze this data considering:
-        1. Current operational efficiency and any anomalies
-        2. Impact of environmental conditions on operations
-        3. Opportunities for alternative fuel utilization
-        4. Chemistry balance and product quality
-        5. Energy optimization potential
+    @staticmethod
+    def _reading_value(reading: Any) -> Optional[float]:
+        value = reading.get('value') if isinstance(reading, dict) else reading
+        return value if isinstance(value, (int, float)) else None
+
+    def _trim_for_prompt(self, readings: Dict[str, Any],
+                         max_entries: int = _MAX_PROMPT_SENSORS) -> Dict[str, Any]:
+        """Trim sensor readings to a token budget, keeping the most anomalous tags
 
-        Provide your analysis in JSON format:
-        {{
-            "status": "normal/warning/critical",
-            "health_score": 0-100,
-            "efficiency_score": 0-100,
-            "issues": ["list of detected issues with context"],
-            "recommendations": ["specific actionable recommendations"],
-            "optimization_opportunities": ["opportunities based on available resources"],
-            "environmental_adjustments": ["adjustments needed due to weather/conditions"],
-            "fuel_switching_potential": "assessment of alternative fuel usage",
-            "confidence_level": 0-1
-        }}
+        Flagged anomalies and whitelisted tags are always kept; the remaining
+        slots go to the largest |z-score| against each tag's rolling stats.
+        Dropped tags are listed under 'other_tags_normal' so the model knows
+        they were omitted intentionally, not missing.
         """
+        for name, reading in readings.items():
+            value = self._reading_value(reading)
+            if value is not None:
+                self._sensor_stats.setdefault(name, _RollingStats()).update(value)
+
+        if len(readings) <= max_entries:
+            return readings
+
+        def volatility(item):
+            name, reading = item
+            if isinstance(reading, dict) and reading.get('is_anomaly'):
+                return float('inf')
+            value = self._reading_value(reading)
+            stats = self._sensor_stats.get(name)
+            if value is None or stats is None or stats.std == 0:
+                return 0.0
+            return abs(value - stats.mean) / stats.std
+
+        kept = {name: reading for name, reading in readings.items()
+                if name in _PROMPT_SENSOR_WHITELIST}
+        for name, reading in sorted(readings.items(), key=volatility, reverse=True):
+            if len(kept) >= max_entries:
+                break
+            kept.setdefault(name, reading)
+
+        kept['other_tags_normal'] = sorted(set(readings) - set(kept))
+        return kept
 
-        try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
+    async def analyze_with_context(self, unit: str, combined_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze data with environmental and operational context"""
 
-            # Clean JSON response
-            if result_text.startswith('```json'):
-                result_text = result_text[7:]
-            if result_text.endswith('```'):
-                result_text = result_text[:-3]
+        # Sanitize data to remove datetime objects
+        sanitized_data = sanitize_for_json(combined_data)
+        sanitized_data['sensor_readings'] = self._trim_for_prompt(
+            sanitized_data.get('sensor_readings', {})
+        )
 
-            analysis = json.loads(result_text.strip())
+        # Serializing hundreds of sensor readings is CPU work that would
+        # otherwise block concurrent agent analyses on the event loop
+        prompt = await asyncio.to_thread(self._build_analyze_prompt, unit, sanitized_data)
 
-            # Add to context window
+        try:
+            response = await self.model.generate_content_async(
+                prompt, generation_config=_ANALYSIS_GENERATION_CONFIG
+            )
+            analysis = orjson.loads(_extract_json(response.text))
+
+            # Add to context window, expiring stale entries first
+            self._recent_context()
             self.context_window.append({
                 'unit': unit,
-                'analysis': analysis,
-                'timestamp': datetime.utcnow().isoformat()
+                'status': analysis.get('status', 'unknown'),
+                'ts': time.monotonic()
             })
 
             # Maintain context window size
             if len(self.context_window) > self.max_context_length:
-                self.context_window.pop(0)
+                self.context_window.popleft()
 
             return analysis
 
@@ -125,13 +300,15 @@ class EnhancedGeminiService:
         if context:
             context = sanitize_for_json(context)
 
-        # Build historical context summary
+        # Build historical context summary - one line per entry, never the
+        # full analysis dict, to keep prompt tokens bounded
         historical_context = ""
-        if self.context_window:
-            recent_analyses = self.context_window[-3:]
-            historical_context = "RECENT SYSTEM STATE:\n"
-            for ctx in recent_analyses:
-                historical_context += f"- {ctx['unit']}: {ctx['analysis'].get('status', 'unknown')} status\n"
+        recent = self._recent_context()
+        if recent:
+            historical_context = "RECENT SYSTEM STATE:\n" + "\n".join(
+                f"- {ctx['unit']}: {ctx['status']} status"
+                for ctx in recent[-3:]
+            )
 
         # Create simplified context string
         context_str = "No specific context available"
@@ -192,7 +369,7 @@ class EnhancedGeminiService:
     """
 
         try:
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
 
             # Calculate confidence
             confidence = 0.5
@@ -226,6 +403,33 @@ class EnhancedGeminiService:
                 "error": str(e)
             }
 
+    def _build_plan_prompt(self,
+                           current_state: Dict[str, Any],
+                           target_metrics: Dict[str, Any],
+                           constraints: Dict[str, Any]) -> str:
+        """Build the optimization-plan prompt (CPU-bound, run off the event loop)"""
+        if not target_metrics:
+            targets_block = _DEFAULT_TARGETS_BLOCK
+        else:
+            targets_block = _format_targets_block(
+                target_metrics.get('thermal_energy', 3.2),
+                target_metrics.get('electrical_energy', 95),
+                target_metrics.get('co2_emission', 850),
+                target_metrics.get('alternative_fuel_rate', 50)
+            )
+
+        return f"""
+        As a cement plant optimization expert, create a detailed optimization plan.
+
+        CURRENT STATE:
+        {json.dumps(current_state, indent=2)}
+
+        {targets_block}
+
+        CONSTRAINTS:
+        {json.dumps(constraints, indent=2)}
+        """ + _PLAN_PROMPT_SUFFIX
+
     async def generate_optimization_plan(self,
                                          current_state: Dict[str, Any],
                                          target_metrics: Dict[str, Any],
@@ -237,48 +441,19 @@ class EnhancedGeminiService:
         target_metrics = sanitize_for_json(target_metrics)
         constraints = sanitize_for_json(constraints)
 
-        prompt = f"""
-        As a cement plant optimization expert, create a detailed optimization plan.
-
-        CURRENT STATE:
-        {json.dumps(current_state, indent=2)}
-
-        TARGET METRICS:
-        - Thermal Energy: < {target_metrics.get('thermal_energy', 3.2)} GJ/tonne
-        - Electrical Energy: < {target_metrics.get('electrical_energy', 95)} kWh/tonne
-        - CO2 Emissions: < {target_metrics.get('co2_emission', 850)} kg/tonne
-        - Alternative Fuel Rate: > {target_metrics.get('alternative_fuel_rate', 50)}%
-
-        CONSTRAINTS:
-        {json.dumps(constraints, indent=2)}
-
-        Generate an optimization plan with:
-        1. Specific parameter adjustments with expected impact
-        2. Implementation sequence and timeline
-        3. Risk assessment and mitigation strategies
-        4. Expected ROI and payback period
-        5. Monitoring KPIs
-
-        Format as JSON with structure:
-        {{
-            "parameter_adjustments": {{"parameter": {{"current": value, "target": value, "impact": "description"}}}},
-            "implementation_phases": [{{"phase": 1, "duration_days": N, "actions": [], "expected_results": {{}}}}],
-            "risk_assessment": [{{"risk": "description", "probability": "low/medium/high", "mitigation": "strategy"}}],
-            "financial_analysis": {{"investment_required": value, "annual_savings": value, "payback_months": N}},
-            "success_metrics": [{{"kpi": "name", "current": value, "target": value, "measurement_frequency": "daily/weekly"}}]
-        }}
-        """
+        prompt = await asyncio.to_thread(
+            self._build_plan_prompt, current_state, target_metrics, constraints
+        )
 
         try:
-            response = self.model.generate_content(prompt)
-            result_text = response.text.strip()
-
-            if result_text.startswith('```json'):
-                result_text = result_text[7:]
-            if result_text.endswith('```'):
-                result_text = result_text[:-3]
-
-            return json.loads(result_text.strip())
+            # Plans are multi-KB JSON bodies; streaming lets transfer overlap
+            # generation instead of waiting for the full response
+            buf = io.StringIO()
+            async for chunk in await self.model.generate_content_async(
+                    prompt, generation_config=_JSON_GENERATION_CONFIG, stream=True
+            ):
+                buf.write(chunk.text)
+            return orjson.loads(_extract_json(buf.getvalue()))
 
         except Exception as e:
             logger.error(f"Error generating optimization plan: {e}")